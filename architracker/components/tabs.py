@@ -670,7 +670,7 @@ def metamob_tab() -> rx.Component:
                 rx.button("Copy JSON", on_click=rx.set_clipboard(TrackerState.mm_body), background=SURFACE, border=f"1px solid {LINE}", color=TEXT),
                 rx.button("Send update", on_click=TrackerState.send_metamob_update, background=SURFACE, border=f"1px solid {LINE}", color=TEXT),
                 rx.button("Force validated trades", on_click=TrackerState.force_validated_trades, background=SURFACE, border=f"1px solid {LINE}", color=TEXT),
-                rx.button("Reset monsters", on_click=TrackerState.reset_metamob_monsters, background=SURFACE, border=f"1px solid {LINE}", color=TEXT),
+                rx.button("Reset monsters", on_click=TrackerState.reset_metamob_monsters, loading=TrackerState.mm_reset_running, background=SURFACE, border=f"1px solid {LINE}", color=TEXT),
                 wrap="wrap",
                 spacing="3",
                 width="100%",
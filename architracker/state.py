@@ -1,18 +1,31 @@
 from __future__ import annotations
 
+import asyncio
+import atexit
+import functools
 import json
 import os
+import re
 import signal
 import subprocess
 import sys
 import threading
 import time
 import unicodedata
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from pathlib import Path
 
 import reflex as rx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson  # faster results.json encode/decode
+except ImportError:
+    orjson = None  # type: ignore
 
 
 APP_ROOT = Path(__file__).resolve().parents[1]
@@ -27,6 +40,11 @@ LOG_DIR = APP_ROOT / "logs"
 METAMOB_BASE_URL = "https://www.metamob.fr/api"
 
 FILE_LOCK = threading.Lock()
+SAVE_DEBOUNCE_SECONDS = 0.25
+PENDING_PROFILE_WRITES: dict[str, dict] = {}
+_save_timer: threading.Timer | None = None
+# Last parsed results.json, reused until the file's mtime changes (the scanner writes it too)
+RESULTS_CACHE: dict = {"mtime_ns": None, "data": None}
 DEFAULT_PROFILE = "kourial"
 SCAN_STAGING_PROFILE = "__scan_staging__"
 DEFAULT_SERVERS = [
@@ -44,6 +62,18 @@ DEFAULT_SERVERS = [
     "Ombre",
 ]
 
+QUEST_FETCH_CONCURRENCY = 8
+PATCH_CHUNK_SIZE = 200
+PATCH_CONCURRENCY = 6
+USERNAME_CACHE_TTL = 600.0
+USERNAME_CACHE: dict[str, tuple[float, str]] = {}
+QUEST_META_TTL = 60.0
+QUEST_META_CACHE: dict[tuple[str, str], dict] = {}
+# Scanner processes started by this server, by pid; a waiter thread per process reaps it on exit
+SCAN_PROCESSES: dict[int, subprocess.Popen] = {}
+CONFIG_CACHE: dict = {"mtime_ns": None, "config": {}, "headers": {}, "api_key": ""}
+PASTE_SEPARATORS = re.compile(r"[,\n;]+")
+
 
 def _to_int(value, default=0) -> int:
     try:
@@ -57,11 +87,19 @@ def _to_int(value, default=0) -> int:
         return default
 
 
+# Resets touch every monster of a quest: batch size and fan-out are tunable from the environment.
+RESET_CHUNK_SIZE = max(1, _to_int(os.environ.get("RESET_CHUNK_SIZE"), PATCH_CHUNK_SIZE))
+RESET_CONCURRENCY = max(1, _to_int(os.environ.get("RESET_CONCURRENCY"), 8))
+# Pooled HTTPS connections kept open to Metamob
+UPSTREAM_POOL = max(1, _to_int(os.environ.get("UPSTREAM_POOL"), 32))
+
+
 def _chunk(items: list[dict], size: int):
     for i in range(0, len(items), size):
         yield items[i : i + size]
 
 
+@functools.lru_cache(maxsize=64)
 def _safe_profile(name: str | None) -> str:
     if not name:
         return DEFAULT_PROFILE
@@ -78,7 +116,7 @@ def _load_characters() -> list[dict]:
     chars: list[dict] = []
     if CHARACTERS_FILE.exists():
         try:
-            raw = json.loads(CHARACTERS_FILE.read_text(encoding="utf-8"))
+            raw = _read_json_file(CHARACTERS_FILE)
         except Exception:
             raw = []
         if isinstance(raw, list):
@@ -119,8 +157,7 @@ def _save_characters(characters: list[dict]) -> None:
         server = str(char.get("server", "") or "").strip()
         if cid and name and server:
             sanitized.append({"id": cid, "name": name, "server": server})
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    CHARACTERS_FILE.write_text(json.dumps(sanitized, ensure_ascii=False, indent=2), encoding="utf-8")
+    _write_json_file(CHARACTERS_FILE, sanitized)
 
 
 def _normalize_for_search(value: str) -> str:
@@ -130,6 +167,7 @@ def _normalize_for_search(value: str) -> str:
     return "".join(char for char in normalized if not unicodedata.combining(char)).lower()
 
 
+@functools.lru_cache(maxsize=4096)
 def _normalize_for_tokens(value: str) -> str:
     base = _normalize_for_search(value or "")
     out = []
@@ -138,10 +176,73 @@ def _normalize_for_tokens(value: str) -> str:
     return " ".join("".join(out).split())
 
 
+def _read_json_file(path: Path):
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _json_loads(text: str):
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _json_dumps_pretty(payload) -> str:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(payload, ensure_ascii=False, indent=2)
+
+
+def _write_json_file(path: Path, payload) -> None:
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+        return
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def _trade_flags(qty: int, step: int, validated: set[int], offer_mode: str) -> tuple[bool, bool]:
+    wanted = qty <= 0 and step not in validated
+    offered = qty > 1 or (qty >= 1 and step in validated)
+    if offered and offer_mode == "x3":
+        offered = qty >= 3
+    return offered, wanted
+
+
+def _totals_row(qty: int, step: int, validated: set[int]) -> tuple[int, int, int, int]:
+    # One monster's contribution to (collected, needed, duplicate, triple).
+    return int(qty > 0), int(qty == 0 and step not in validated), int(1 < qty < 3), int(qty >= 3)
+
+
 def _load_all_results() -> dict:
+    _flush_profile_writes()
+    return _read_all_results()
+
+
+def _read_all_results() -> dict:
+    mtime = _mtime_ns(RESULTS_FILE)
+    cached = RESULTS_CACHE["data"]
+    if cached is None or mtime is None or mtime != RESULTS_CACHE["mtime_ns"]:
+        cached = _parse_all_results()
+        RESULTS_CACHE["mtime_ns"] = mtime
+        RESULTS_CACHE["data"] = cached
+    # Callers replace profile entries but never mutate them, so copying the two top levels is enough.
+    data = dict(cached)
+    data["profiles"] = dict(cached.get("profiles") or {})
+    return data
+
+
+def _write_all_results(all_data: dict) -> None:
+    _write_json_file(RESULTS_FILE, all_data)
+    RESULTS_CACHE["mtime_ns"] = _mtime_ns(RESULTS_FILE)
+    RESULTS_CACHE["data"] = all_data
+
+
+def _parse_all_results() -> dict:
     if RESULTS_FILE.exists():
         try:
-            raw = json.loads(RESULTS_FILE.read_text(encoding="utf-8"))
+            raw = _read_json_file(RESULTS_FILE)
         except Exception:
             raw = {}
     else:
@@ -151,7 +252,7 @@ def _load_all_results() -> dict:
         return raw
 
     if isinstance(raw, dict) and "counts" in raw:
-        return {"profiles": {"default": raw}, "activeProfile": "default", **raw}
+        return {"profiles": {"default": raw}, "activeProfile": "default"}
 
     return {"profiles": {}, "activeProfile": "kourial"}
 
@@ -168,15 +269,59 @@ def _write_profile_payload(data: dict, profile: str, payload: dict) -> dict:
     profiles[profile] = payload
     data["profiles"] = profiles
     data["activeProfile"] = profile
+    # Payloads live under "profiles" only; drop the old top-level mirror of the active one.
     for key in list(data.keys()):
         if key not in {"profiles", "activeProfile"}:
             del data[key]
-    data.update(payload)
     return data
 
 
+def _flush_profile_writes() -> None:
+    global _save_timer
+    with FILE_LOCK:
+        if _save_timer is not None:
+            _save_timer.cancel()
+            _save_timer = None
+        if not PENDING_PROFILE_WRITES:
+            return
+        all_data = _read_all_results()
+        for profile, payload in PENDING_PROFILE_WRITES.items():
+            all_data = _write_profile_payload(all_data, profile, payload)
+        PENDING_PROFILE_WRITES.clear()
+        _write_all_results(all_data)
+
+
+def _schedule_profile_write(profile: str, payload: dict) -> None:
+    # Coalesce rapid edits (quantity clicks, trades) into a single results.json write.
+    global _save_timer
+    with FILE_LOCK:
+        PENDING_PROFILE_WRITES.pop(profile, None)
+        PENDING_PROFILE_WRITES[profile] = payload
+        if _save_timer is None:
+            _save_timer = threading.Timer(SAVE_DEBOUNCE_SECONDS, _flush_profile_writes)
+            _save_timer.daemon = True
+            _save_timer.start()
+
+
+atexit.register(_flush_profile_writes)
+
+
+def _mtime_ns(path: Path) -> int | None:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
 def _load_monsters() -> tuple[list[dict], list[str], list[int]]:
-    raw = json.loads(ZONES_FILE.read_text(encoding="utf-8"))
+    monsters, souszones, steps = _parse_zones_file(_mtime_ns(ZONES_FILE))
+    return list(monsters), list(souszones), list(steps)
+
+
+@functools.lru_cache(maxsize=2)
+def _parse_zones_file(zones_mtime: int | None) -> tuple[list[dict], list[str], list[int]]:
+    # Keyed on the file mtime so each session reuses one parse until the zones file changes.
+    raw = _read_json_file(ZONES_FILE)
     monsters: list[dict] = []
     souszones: set[str] = set()
     steps: set[int] = set()
@@ -203,37 +348,60 @@ def _load_monsters() -> tuple[list[dict], list[str], list[int]]:
 
 
 def _load_config() -> dict:
-    if not CONFIG_FILE.exists():
-        return {}
-    try:
-        loaded = json.loads(CONFIG_FILE.read_text(encoding="utf-8"))
-        return loaded if isinstance(loaded, dict) else {}
-    except Exception:
-        return {}
+    return dict(_cached_config())
+
+
+def _cached_config() -> dict:
+    # Every Metamob call builds headers from the config: only re-read the file when its mtime changes.
+    mtime = _mtime_ns(CONFIG_FILE)
+    if mtime is not None and mtime == CONFIG_CACHE["mtime_ns"]:
+        return CONFIG_CACHE["config"]
+    loaded = {}
+    if mtime is not None:
+        try:
+            loaded = _read_json_file(CONFIG_FILE)
+        except Exception:
+            loaded = {}
+    _remember_config(mtime, loaded if isinstance(loaded, dict) else {})
+    return CONFIG_CACHE["config"]
+
+
+def _remember_config(mtime: int | None, config: dict) -> None:
+    api_key = str(config.get("apiKey", "") or "").strip()
+    headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+    CONFIG_CACHE.update({"mtime_ns": mtime, "config": config, "headers": headers, "api_key": api_key})
 
 
 def _save_config(config: dict) -> None:
     payload = config if isinstance(config, dict) else {}
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    CONFIG_FILE.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    _write_json_file(CONFIG_FILE, payload)
+    _remember_config(_mtime_ns(CONFIG_FILE), dict(payload))
+
+
+def _build_metamob_session() -> requests.Session:
+    # One pooled session so repeated Metamob calls reuse the HTTPS connection instead of a new TLS handshake.
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504], raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=UPSTREAM_POOL, pool_maxsize=UPSTREAM_POOL, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Content-Type": "application/json"})
+    return session
+
+
+METAMOB_SESSION = _build_metamob_session()
 
 
 def _build_metamob_headers() -> tuple[dict, str]:
-    cfg = _load_config()
-    if not isinstance(cfg, dict):
-        cfg = {}
-    api_key = str(cfg.get("apiKey", "") or "").strip()
-    headers = {"Content-Type": "application/json"}
-    if api_key:
-        headers["Authorization"] = f"Bearer {api_key}"
-    return headers, api_key
+    _cached_config()
+    return dict(CONFIG_CACHE["headers"]), CONFIG_CACHE["api_key"]
 
 
 def _api_json(method: str, path: str, params: dict | None = None, body: dict | list | None = None):
     headers, _ = _build_metamob_headers()
     url = f"{METAMOB_BASE_URL}{path}"
     try:
-        resp = requests.request(method, url, headers=headers, params=params, json=body, timeout=25)
+        resp = METAMOB_SESSION.request(method, url, headers=headers, params=params, json=body, timeout=25)
     except requests.exceptions.RequestException as exc:
         return None, {"error": f"Metamob API unreachable: {exc}"}
 
@@ -256,17 +424,31 @@ def _resolve_username(pseudo: str) -> str:
     if not raw:
         return raw
 
+    key = raw.casefold()
+    now = time.monotonic()
+    cached = USERNAME_CACHE.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    username, answered = _lookup_username(raw)
+    if answered:
+        USERNAME_CACHE[key] = (now + USERNAME_CACHE_TTL, username)
+    return username
+
+
+def _lookup_username(raw: str) -> tuple[str, bool]:
+    # Returns (username, answered); unanswered lookups (API down/erroring) are not cached.
     resp, _ = _api_json("GET", f"/v1/users/{raw}")
     if resp is not None and resp.ok:
-        return raw
+        return raw, True
 
     resp, payload = _api_json("GET", "/v1/users/search", params={"q": raw, "limit": 50, "offset": 0})
     if resp is None or not resp.ok:
-        return raw
+        return raw, False
 
     data = _extract_data(payload)
     if not isinstance(data, list):
-        return raw
+        return raw, True
 
     wanted = raw.casefold()
     for item in data:
@@ -274,22 +456,49 @@ def _resolve_username(pseudo: str) -> str:
             continue
         username = item.get("username")
         if isinstance(username, str) and username.casefold() == wanted:
-            return username
+            return username, True
 
     for item in data:
         if not isinstance(item, dict):
             continue
         username = item.get("username")
         if isinstance(username, str) and wanted in username.casefold():
-            return username
+            return username, True
+
+    return raw, True
+
+
+def _quest_meta_key(username: str) -> tuple[str, str]:
+    return username.casefold(), _build_metamob_headers()[1]
+
+
+def _cached_quest_meta(username: str) -> dict:
+    entry = QUEST_META_CACHE.get(_quest_meta_key(username))
+    if entry is None or entry["expires"] <= time.monotonic():
+        return {}
+    return entry
 
-    return raw
+
+def _remember_quest_meta(username: str, **fields) -> None:
+    key = _quest_meta_key(username)
+    now = time.monotonic()
+    entry = QUEST_META_CACHE.get(key)
+    if entry is None or entry["expires"] <= now:
+        entry = QUEST_META_CACHE[key] = {"expires": now + QUEST_META_TTL}
+    entry.update(fields)
 
 
 def _resolve_quest_slug(username: str, explicit_slug: str | None = None) -> tuple[str | None, str | None]:
     if explicit_slug:
         return explicit_slug, None
+    cached_slug = _cached_quest_meta(username).get("slug")
+    if cached_slug:
+        return cached_slug, None
     resp, payload = _api_json("GET", f"/v1/users/{username}/quests", params={"limit": 50, "offset": 0})
+    return _pick_quest_slug(username, resp, payload)
+
+
+def _pick_quest_slug(username: str, resp, payload) -> tuple[str | None, str | None]:
     if resp is None:
         return None, "Metamob API unreachable while loading quests."
     if not resp.ok:
@@ -311,47 +520,157 @@ def _resolve_quest_slug(username: str, explicit_slug: str | None = None) -> tupl
     slug = best.get("slug") if isinstance(best, dict) else None
     if not slug:
         return None, "Unable to determine quest slug."
+    _remember_quest_meta(username, slug=str(slug))
     return str(slug), None
 
 
+def _resolve_user_quest(pseudo: str) -> tuple[str, str | None, str | None]:
+    # Username + quest slug in one round-trip when the pseudo is already a valid username:
+    # its quest list both proves the account exists and yields the slug.
+    raw = (pseudo or "").strip()
+    cached = USERNAME_CACHE.get(raw.casefold())
+    if not raw or (cached is not None and cached[0] > time.monotonic()):
+        username = _resolve_username(raw)
+        slug, err = _resolve_quest_slug(username)
+        return username, slug, err
+
+    cached_slug = _cached_quest_meta(raw).get("slug")
+    if cached_slug:
+        return _resolve_username(raw), cached_slug, None
+
+    resp, payload = _api_json("GET", f"/v1/users/{raw}/quests", params={"limit": 50, "offset": 0})
+    if resp is None:
+        return raw, None, "Metamob API unreachable while loading quests."
+    if resp.ok:
+        USERNAME_CACHE[raw.casefold()] = (time.monotonic() + USERNAME_CACHE_TTL, raw)
+        slug, err = _pick_quest_slug(raw, resp, payload)
+        return raw, slug, err
+
+    # Unknown as typed (e.g. wrong case): fall back to the user search.
+    username = _resolve_username(raw)
+    slug, err = _resolve_quest_slug(username)
+    return username, slug, err
+
+
+def _quest_parallel_quests(username: str, slug: str) -> int:
+    meta = _cached_quest_meta(username)
+    if meta.get("slug") == slug and "parallel_quests" in meta:
+        return meta["parallel_quests"]
+
+    resp, payload = _api_json("GET", f"/v1/users/{username}/quests/{slug}", params={"limit": 1, "offset": 0})
+    if resp is None or not resp.ok:
+        return 1
+    data = _extract_data(payload)
+    parallel_quests = max(1, _to_int(data.get("parallel_quests"), default=1)) if isinstance(data, dict) else 1
+    _remember_quest_meta(username, slug=slug, parallel_quests=parallel_quests)
+    return parallel_quests
+
+
+def _fetch_quest_monsters_page(
+    username: str, slug: str, offset: int, limit: int, monster_type: int | None
+) -> tuple[list[dict] | None, int | None, str | None]:
+    params = {"limit": limit, "offset": offset}
+    if monster_type is not None:
+        params["monster_type"] = monster_type
+    resp, payload = _api_json("GET", f"/v1/users/{username}/quests/{slug}", params=params)
+    if resp is None:
+        return None, None, "Metamob API unreachable while loading monsters."
+    if not resp.ok:
+        return None, None, f"Failed to load monsters: HTTP {resp.status_code}"
+
+    data = _extract_data(payload)
+    if not isinstance(data, dict):
+        return None, None, "Unexpected quest response format."
+
+    page_monsters = data.get("monsters") or []
+    if not isinstance(page_monsters, list):
+        page_monsters = []
+    pagination = data.get("pagination") or {}
+    total = pagination.get("total") if isinstance(pagination, dict) else None
+    return page_monsters, total if isinstance(total, int) else None, None
+
+
 def _fetch_all_quest_monsters(username: str, slug: str, monster_type: int | None = None) -> tuple[list[dict] | None, str | None]:
-    monsters: list[dict] = []
     limit = 200
-    offset = 0
-    total = None
-
-    while True:
-        params = {"limit": limit, "offset": offset}
-        if monster_type is not None:
-            params["monster_type"] = monster_type
-        resp, payload = _api_json("GET", f"/v1/users/{username}/quests/{slug}", params=params)
-        if resp is None:
-            return None, "Metamob API unreachable while loading monsters."
-        if not resp.ok:
-            return None, f"Failed to load monsters: HTTP {resp.status_code}"
+    page_monsters, total, err = _fetch_quest_monsters_page(username, slug, 0, limit, monster_type)
+    if err:
+        return None, err
+    pages = [page_monsters]
+    offset = len(page_monsters)
+
+    if total is not None and len(page_monsters) == limit and offset < total:
+        # The total is known after the first page: fetch the rest concurrently, in offset order.
+        offsets = range(offset, total, limit)
+        with ThreadPoolExecutor(max_workers=min(QUEST_FETCH_CONCURRENCY, len(offsets))) as pool:
+            results = list(
+                pool.map(lambda page_offset: _fetch_quest_monsters_page(username, slug, page_offset, limit, monster_type), offsets)
+            )
+        for page_monsters, _, err in results:
+            if err:
+                return None, err
+            pages.append(page_monsters)
+    else:
+        # No usable total: walk pages until a short or empty one.
+        while page_monsters and len(page_monsters) == limit and (total is None or offset < total):
+            page_monsters, total, err = _fetch_quest_monsters_page(username, slug, offset, limit, monster_type)
+            if err:
+                return None, err
+            pages.append(page_monsters)
+            offset += len(page_monsters)
+
+    return [monster for page in pages for monster in page if isinstance(monster, dict)], None
+
+
+def _patch_quest_monsters(
+    slug: str,
+    items: list[dict],
+    failure: str,
+    chunk_size: int = PATCH_CHUNK_SIZE,
+    concurrency: int = PATCH_CONCURRENCY,
+) -> tuple[int, str | None]:
+    # PATCH chunks concurrently; the first failure cancels chunks not yet sent.
+    chunks = list(_chunk(items, chunk_size))
+    if not chunks:
+        return 0, None
+    updated = 0
+    pool = ThreadPoolExecutor(max_workers=min(concurrency, len(chunks)))
+    try:
+        futures = {
+            pool.submit(_api_json, "PATCH", f"/v1/quests/{slug}/monsters", body={"monsters": chunk}): len(chunk)
+            for chunk in chunks
+        }
+        for future in as_completed(futures):
+            resp, _ = future.result()
+            if resp is None:
+                return updated, "Metamob API unreachable."
+            if not resp.ok:
+                return updated, f"{failure}: HTTP {resp.status_code}"
+            updated += futures[future]
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    return updated, None
 
-        data = _extract_data(payload)
-        if not isinstance(data, dict):
-            return None, "Unexpected quest response format."
 
-        page_monsters = data.get("monsters") or []
-        if not isinstance(page_monsters, list):
-            page_monsters = []
-        monsters.extend(page_monsters)
+def _reset_quest_monsters(pseudo: str) -> str:
+    username, slug, err = _resolve_user_quest(pseudo)
+    if err or not slug:
+        return err or "Unable to resolve quest."
 
-        pagination = data.get("pagination") or {}
-        if isinstance(pagination, dict):
-            total = pagination.get("total", total)
-        offset += len(page_monsters)
+    monsters, err = _fetch_all_quest_monsters(username, slug, monster_type=3)
+    if err or monsters is None:
+        return err or "Unable to load quest monsters."
 
-        if len(page_monsters) == 0:
-            break
-        if isinstance(total, int) and offset >= total:
-            break
-        if len(page_monsters) < limit:
-            break
+    # IDs decode as ints already; only odd (string) values go through _to_int.
+    raw_ids = (monster.get("id") for monster in monsters)
+    monster_ids = (raw if isinstance(raw, int) else _to_int(raw, default=-1) for raw in raw_ids)
+    reset_items = [{"monster_id": monster_id, "quantity": 0} for monster_id in monster_ids if monster_id > 0]
 
-    return monsters, None
+    updated, err = _patch_quest_monsters(
+        slug, reset_items, "Reset failed", chunk_size=RESET_CHUNK_SIZE, concurrency=RESET_CONCURRENCY
+    )
+    if err:
+        return err
+    return f"Profile reset complete: {updated} monsters."
 
 
 class TrackerState(rx.State):
@@ -366,6 +685,7 @@ class TrackerState(rx.State):
     souszones: list[str] = []
     steps: list[int] = []
     counts: dict[str, int] = {}
+    totals: dict[str, int] = {"all": 0, "needed": 0, "collected": 0, "duplicate": 0, "triple": 0}
     validated_steps: list[int] = []
 
     tool_status: str = "Scanner status unknown"
@@ -380,6 +700,7 @@ class TrackerState(rx.State):
     mm_status: str = ""
     last_updated: str = ""
     mm_settings_loaded: bool = False
+    mm_reset_running: bool = False
     mm_qs_character_name: str = ""
     mm_qs_parallel_quests: str = "1"
     mm_qs_current_step: str = "1"
@@ -511,20 +832,46 @@ class TrackerState(rx.State):
             {int(v) for v in (payload.get("validatedSteps") or []) if isinstance(v, (int, float)) and int(v) >= 1}
         )
         self.last_updated = str(payload.get("timestamp", ""))
+        self._recompute_totals()
+
+    def _recompute_totals(self):
+        validated = set(self.validated_steps)
+        sums = [0, 0, 0, 0]
+        for monster in self.monsters:
+            row = _totals_row(int(self.counts.get(monster["name"], 0)), monster["step"], validated)
+            for index, value in enumerate(row):
+                sums[index] += value
+        collected, needed, duplicate, triple = sums
+        self.totals = {
+            "all": len(self.monsters),
+            "needed": needed,
+            "collected": collected,
+            "duplicate": duplicate,
+            "triple": triple,
+        }
+
+    def _adjust_totals(self, step: int | None, before: int, after: int):
+        # O(1) update for a single count change instead of walking every monster.
+        # Callers take the step from self.monsters, the same source _recompute_totals uses.
+        if step is None or before == after:
+            return
+        validated = set(self.validated_steps)
+        old = _totals_row(before, step, validated)
+        new = _totals_row(after, step, validated)
+        totals = dict(self.totals)
+        for key, old_value, new_value in zip(("collected", "needed", "duplicate", "triple"), old, new):
+            totals[key] += new_value - old_value
+        self.totals = totals
 
     def _save_profile_data(self):
         payload = {
-            "counts": self.counts,
-            "validatedSteps": self.validated_steps,
+            "counts": dict(self.counts),
+            "validatedSteps": list(self.validated_steps),
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "scanned": len(self.counts),
             "total": len(self.monsters),
         }
-        with FILE_LOCK:
-            all_data = _load_all_results()
-            all_data = _write_profile_payload(all_data, self.profile, payload)
-            DATA_DIR.mkdir(parents=True, exist_ok=True)
-            RESULTS_FILE.write_text(json.dumps(all_data, ensure_ascii=False, indent=2), encoding="utf-8")
+        _schedule_profile_write(self.profile, payload)
         self.last_updated = payload["timestamp"]
 
     @rx.event
@@ -644,18 +991,22 @@ class TrackerState(rx.State):
     def update_quantity(self, name: str, delta: int):
         current = int(self.counts.get(name, 0))
         self.counts[name] = max(0, current + int(delta))
+        step = next((monster["step"] for monster in self.monsters if monster["name"] == name), None)
+        self._adjust_totals(step, current, self.counts[name])
         self._save_profile_data()
 
     @rx.event
     def validate_active_step(self):
         if self.active_step > 0 and self.active_step not in self.validated_steps:
             self.validated_steps = sorted(self.validated_steps + [self.active_step])
+            self._recompute_totals()
             self._save_profile_data()
 
     @rx.event
     def unvalidate_active_step(self):
         if self.active_step > 0 and self.active_step in self.validated_steps:
             self.validated_steps = [step for step in self.validated_steps if step != self.active_step]
+            self._recompute_totals()
             self._save_profile_data()
 
     @rx.event
@@ -677,6 +1028,13 @@ class TrackerState(rx.State):
 
     @staticmethod
     def _is_pid_running(pid: int) -> bool:
+        proc = SCAN_PROCESSES.get(pid)
+        if proc is not None:
+            # The waiter thread sets returncode as soon as the process exits: no syscall per status poll.
+            if proc.returncode is None:
+                return True
+            SCAN_PROCESSES.pop(pid, None)
+            return False
         try:
             os.kill(pid, 0)
             return True
@@ -699,13 +1057,18 @@ class TrackerState(rx.State):
         LOG_DIR.mkdir(parents=True, exist_ok=True)
         out_log = LOG_DIR / "scan.out.log"
         err_log = LOG_DIR / "scan.err.log"
-        proc = subprocess.Popen(
-            [sys.executable, str(SCAN_SCRIPT)],
-            cwd=str(PROJECT_ROOT),
-            env=env,
-            stdout=open(out_log, "a", encoding="utf-8"),
-            stderr=open(err_log, "a", encoding="utf-8"),
-        )
+        # No preexec_fn/pass_fds so CPython keeps its vfork fast path on POSIX; the child gets its own
+        # copies of the log handles, so the parent closes them right after spawning.
+        with open(out_log, "a", encoding="utf-8") as out_file, open(err_log, "a", encoding="utf-8") as err_file:
+            proc = subprocess.Popen(
+                [sys.executable, str(SCAN_SCRIPT)],
+                cwd=str(PROJECT_ROOT),
+                env=env,
+                stdout=out_file,
+                stderr=err_file,
+            )
+        SCAN_PROCESSES[proc.pid] = proc
+        threading.Thread(target=proc.wait, name=f"scan-reaper-{proc.pid}", daemon=True).start()
         time.sleep(0.7)
         if proc.poll() is not None:
             self.scan_pid = 0
@@ -752,8 +1115,7 @@ class TrackerState(rx.State):
         if isinstance(profiles, dict) and SCAN_STAGING_PROFILE in profiles:
             del profiles[SCAN_STAGING_PROFILE]
             all_data["profiles"] = profiles
-        DATA_DIR.mkdir(parents=True, exist_ok=True)
-        RESULTS_FILE.write_text(json.dumps(all_data, ensure_ascii=False, indent=2), encoding="utf-8")
+        _write_all_results(all_data)
 
         self.profile = target
         self.scan_result_ready = False
@@ -793,6 +1155,8 @@ class TrackerState(rx.State):
             cfg = {}
         cfg["apiKey"] = value
         _save_config(cfg)
+        USERNAME_CACHE.clear()
+        QUEST_META_CACHE.clear()
         self.mm_status = "Metamob API key saved."
 
     @rx.event
@@ -802,7 +1166,7 @@ class TrackerState(rx.State):
     @rx.event
     def generate_mm_body(self):
         monsters = [{"monster_id": m["id"], "quantity": int(self.counts.get(m["name"], 0))} for m in self.monsters]
-        self.mm_body = json.dumps({"monsters": monsters}, ensure_ascii=False, indent=2)
+        self.mm_body = _json_dumps_pretty({"monsters": monsters})
         self.mm_status = f"Generated {len(monsters)} monsters in API v1 format."
 
     @rx.event
@@ -820,7 +1184,7 @@ class TrackerState(rx.State):
             return
 
         try:
-            payload = json.loads(self.mm_body)
+            payload = _json_loads(self.mm_body)
         except Exception as err:
             self.mm_status = f"Invalid JSON: {err}"
             return
@@ -830,8 +1194,7 @@ class TrackerState(rx.State):
             self.mm_status = 'Expected payload as [{"monster_id","quantity"}] or {"monsters":[...]}'
             return
 
-        username = _resolve_username(pseudo)
-        slug, err = _resolve_quest_slug(username)
+        username, slug, err = _resolve_user_quest(pseudo)
         if err or not slug:
             self.mm_status = err or "Unable to resolve quest."
             return
@@ -850,16 +1213,10 @@ class TrackerState(rx.State):
             self.mm_status = "No valid monster updates found in payload."
             return
 
-        updated = 0
-        for chunk in _chunk(patch_items, 200):
-            resp, _ = _api_json("PATCH", f"/v1/quests/{slug}/monsters", body={"monsters": chunk})
-            if resp is None:
-                self.mm_status = "Metamob API unreachable."
-                return
-            if not resp.ok:
-                self.mm_status = f"Update failed: HTTP {resp.status_code}"
-                return
-            updated += len(chunk)
+        updated, err = _patch_quest_monsters(slug, patch_items, "Update failed")
+        if err:
+            self.mm_status = err
+            return
 
         self.mm_status = f"Profile updated: {updated} monsters patched."
 
@@ -877,8 +1234,7 @@ class TrackerState(rx.State):
             self.mm_status = "No validated steps selected in tracker."
             return
 
-        username = _resolve_username(pseudo)
-        slug, err = _resolve_quest_slug(username)
+        username, slug, err = _resolve_user_quest(pseudo)
         if err or not slug:
             self.mm_status = err or "Unable to resolve quest."
             return
@@ -888,18 +1244,11 @@ class TrackerState(rx.State):
             self.mm_status = err or "Unable to load quest monsters."
             return
 
-        qresp, qpayload = _api_json("GET", f"/v1/users/{username}/quests/{slug}", params={"limit": 1, "offset": 0})
-        parallel_quests = 1
-        if qresp is not None and qresp.ok:
-            qdata = _extract_data(qpayload)
-            if isinstance(qdata, dict):
-                parallel_quests = max(1, _to_int(qdata.get("parallel_quests"), default=1))
+        parallel_quests = _quest_parallel_quests(username, slug)
 
         validated_set = set(int(step) for step in self.validated_steps)
         targets: list[dict] = []
         for monster in monsters:
-            if not isinstance(monster, dict):
-                continue
             step = _to_int(monster.get("step"), default=0)
             qty = _to_int(monster.get("quantity"), default=0)
             monster_id = _to_int(monster.get("id"), default=-1)
@@ -910,59 +1259,37 @@ class TrackerState(rx.State):
             self.mm_status = "No owned archimonsters in validated steps to force."
             return
 
-        forced = 0
-        for chunk in _chunk(targets, 200):
-            resp, _ = _api_json("PATCH", f"/v1/quests/{slug}/monsters", body={"monsters": chunk})
-            if resp is None:
-                self.mm_status = "Metamob API unreachable."
-                return
-            if not resp.ok:
-                self.mm_status = f"Force trades failed: HTTP {resp.status_code}"
-                return
-            forced += len(chunk)
-
-        self.mm_status = f"Forced offers on {forced}/{len(targets)} monsters."
-
-    @rx.event
-    def reset_metamob_monsters(self):
-        pseudo = self._effective_mm_pseudo()
-        if not pseudo:
-            self.mm_status = "No selected character available for Metamob pseudo."
-            return
-        headers, api_key = _build_metamob_headers()
-        if not api_key:
-            self.mm_status = "Metamob API key missing in metamob.config.json."
-            return
-
-        username = _resolve_username(pseudo)
-        slug, err = _resolve_quest_slug(username)
-        if err or not slug:
-            self.mm_status = err or "Unable to resolve quest."
+        forced, err = _patch_quest_monsters(slug, targets, "Force trades failed")
+        if err:
+            self.mm_status = err
             return
 
-        monsters, err = _fetch_all_quest_monsters(username, slug, monster_type=3)
-        if err or monsters is None:
-            self.mm_status = err or "Unable to load quest monsters."
-            return
-
-        reset_items: list[dict] = []
-        for monster in monsters:
-            monster_id = _to_int(monster.get("id"), default=-1) if isinstance(monster, dict) else -1
-            if monster_id > 0:
-                reset_items.append({"monster_id": monster_id, "quantity": 0})
+        self.mm_status = f"Forced offers on {forced}/{len(targets)} monsters."
 
-        updated = 0
-        for chunk in _chunk(reset_items, 200):
-            resp, _ = _api_json("PATCH", f"/v1/quests/{slug}/monsters", body={"monsters": chunk})
-            if resp is None:
-                self.mm_status = "Metamob API unreachable."
+    @rx.event(background=True)
+    async def reset_metamob_monsters(self):
+        # Runs as a background task: a large quest reset no longer blocks other events for this client.
+        async with self:
+            if self.mm_reset_running:
                 return
-            if not resp.ok:
-                self.mm_status = f"Reset failed: HTTP {resp.status_code}"
+            pseudo = self._effective_mm_pseudo()
+            if not pseudo:
+                self.mm_status = "No selected character available for Metamob pseudo."
                 return
-            updated += len(chunk)
+            _, api_key = _build_metamob_headers()
+            if not api_key:
+                self.mm_status = "Metamob API key missing in metamob.config.json."
+                return
+            self.mm_reset_running = True
+            self.mm_status = "Resetting quest monsters..."
 
-        self.mm_status = f"Profile reset complete: {updated} monsters."
+        status = "Reset failed."
+        try:
+            status = await asyncio.to_thread(_reset_quest_monsters, pseudo)
+        finally:
+            async with self:
+                self.mm_reset_running = False
+                self.mm_status = status
 
     @rx.event
     def load_quest_settings(self):
@@ -975,8 +1302,7 @@ class TrackerState(rx.State):
             self.mm_status = "Metamob API key missing in metamob.config.json."
             return
 
-        username = _resolve_username(pseudo)
-        slug, err = _resolve_quest_slug(username)
+        username, slug, err = _resolve_user_quest(pseudo)
         if err or not slug:
             self.mm_status = err or "Unable to resolve quest."
             return
@@ -1025,8 +1351,7 @@ class TrackerState(rx.State):
             self.mm_status = "Metamob API key missing in metamob.config.json."
             return
 
-        username = _resolve_username(pseudo)
-        slug, err = _resolve_quest_slug(username)
+        username, slug, err = _resolve_user_quest(pseudo)
         if err or not slug:
             self.mm_status = err or "Unable to resolve quest."
             return
@@ -1059,6 +1384,7 @@ class TrackerState(rx.State):
             self.mm_status = f"Failed to save settings: HTTP {resp.status_code}"
             return
 
+        QUEST_META_CACHE.pop(_quest_meta_key(username), None)
         self.mm_status = "Quest settings saved."
 
     @rx.event
@@ -1135,19 +1461,19 @@ class TrackerState(rx.State):
 
     def _parse_pasted_names(self, text: str) -> list[str]:
         index = self._name_index()
-        raw_tokens = [token.strip() for token in (text or "").replace(";", ",").replace("\n", ",").split(",") if token.strip()]
+        # Deduplicate normalized tokens first: pasted lists often repeat names, and unknown
+        # tokens fall back to a substring scan over the whole index.
+        keys = dict.fromkeys(
+            _normalize_for_tokens(token) for token in (part.strip() for part in PASTE_SEPARATORS.split(text or "")) if token
+        )
         matched: set[str] = set()
-        for token in raw_tokens:
-            key = _normalize_for_tokens(token)
+        for key in keys:
             if key in index:
-                for name in index[key]:
-                    matched.add(name)
-                continue
-            if len(key) >= 4:
+                matched.update(index[key])
+            elif len(key) >= 4:
                 for idx_key, names in index.items():
                     if key in idx_key:
-                        for name in names:
-                            matched.add(name)
+                        matched.update(names)
         return sorted(matched)
 
     @staticmethod
@@ -1199,8 +1525,7 @@ class TrackerState(rx.State):
             self.trade_status = "Metamob API key missing in metamob.config.json."
             return
 
-        username = _resolve_username(pseudo)
-        slug, err = _resolve_quest_slug(username)
+        username, slug, err = _resolve_user_quest(pseudo)
         if err or not slug:
             self.trade_status = err or "Unable to resolve opponent quest."
             return
@@ -1210,12 +1535,10 @@ class TrackerState(rx.State):
             self.trade_status = err or "Unable to load opponent monsters."
             return
 
-        wants: list[str] = []
-        offers: list[str] = []
-        id_to_name = {int(m["id"]): m["name"] for m in self.monsters if int(m.get("id", 0)) > 0}
+        wants: dict[str, None] = {}
+        offers: dict[str, None] = {}
+        id_to_name = {m["id"]: m["name"] for m in self.monsters if m["id"] > 0}
         for item in monsters:
-            if not isinstance(item, dict):
-                continue
             monster_id = _to_int(item.get("id"), default=-1)
             name_obj = item.get("name") if isinstance(item.get("name"), dict) else {}
             name = (
@@ -1228,12 +1551,12 @@ class TrackerState(rx.State):
             if not name:
                 continue
             if _to_int(item.get("want"), default=0) > 0:
-                wants.append(name)
+                wants[name] = None
             if _to_int(item.get("offer"), default=0) > 0:
-                offers.append(name)
+                offers[name] = None
 
-        self.other_wants_text = ", ".join(sorted(set(wants)))
-        self.other_offers_text = ", ".join(sorted(set(offers)))
+        self.other_wants_text = ", ".join(sorted(wants))
+        self.other_offers_text = ", ".join(sorted(offers))
 
         profile_resp, profile_payload = _api_json("GET", f"/v1/users/{username}")
         if profile_resp is not None and profile_resp.ok:
@@ -1241,7 +1564,7 @@ class TrackerState(rx.State):
         else:
             self.other_ingame = ""
 
-        self.trade_status = f"Loaded opponent lists: {len(set(wants))} wants, {len(set(offers))} offers."
+        self.trade_status = f"Loaded opponent lists: {len(wants)} wants, {len(offers)} offers."
         self.run_trade_compare()
 
     @rx.event
@@ -1254,15 +1577,11 @@ class TrackerState(rx.State):
         my_wants: list[str] = []
         for monster in self.monsters:
             qty = int(self.counts.get(monster["name"], 0))
-            step = int(monster["step"])
-            if qty <= 0 and step not in validated:
+            offered, wanted = _trade_flags(qty, monster["step"], validated, self.trade_offer_mode)
+            if wanted:
                 my_wants.append(monster["name"])
-            if qty > 1 or (qty >= 1 and step in validated):
-                if self.trade_offer_mode == "x3":
-                    if qty >= 3:
-                        my_offers.append(monster["name"])
-                else:
-                    my_offers.append(monster["name"])
+            if offered:
+                my_offers.append(monster["name"])
 
         other_wants_set = set(other_wants)
         other_offers_set = set(other_offers)
@@ -1295,13 +1614,23 @@ class TrackerState(rx.State):
             self.trade_status = "No trade items to apply."
             return
 
+        steps_by_name = {monster["name"]: monster["step"] for monster in self.monsters}
+        delta: Counter[str] = Counter()
         for name in give:
-            self.counts[name] = max(0, int(self.counts.get(name, 0)) - 1)
+            delta[name] -= 1
         for name in receive:
-            self.counts[name] = max(0, int(self.counts.get(name, 0)) + 1)
+            delta[name] += 1
+        touched = set(delta)
+        counts_before = {name: int(self.counts.get(name, 0)) for name in touched}
+
+        for name, change in delta.items():
+            after = max(0, counts_before[name] + change)
+            self.counts[name] = after
+            self._adjust_totals(steps_by_name.get(name), counts_before[name], after)
         self._save_profile_data()
         self.selected_give = []
         self.selected_receive = []
+
         self.run_trade_compare()
         self.trade_status = f"Trade applied. Gave {len(give)}, received {len(receive)}."
 
@@ -1324,7 +1653,7 @@ class TrackerState(rx.State):
         for monster in self.monsters:
             name = monster["name"]
             qty = int(self.counts.get(name, 0))
-            step = int(monster["step"])
+            step = monster["step"]
 
             if self.active_filter == "needed" and qty > 0:
                 continue
@@ -1354,40 +1683,13 @@ class TrackerState(rx.State):
             output.append({**monster, "qty": qty, "status": status})
         return output
 
-    @rx.var
-    def totals(self) -> dict[str, int]:
-        total_collected = 0
-        total_needed = 0
-        total_duplicate = 0
-        total_triple = 0
-        validated = set(self.validated_steps)
-
-        for monster in self.monsters:
-            qty = int(self.counts.get(monster["name"], 0))
-            if qty > 0:
-                total_collected += 1
-            if qty == 0 and int(monster["step"]) not in validated:
-                total_needed += 1
-            if 1 < qty < 3:
-                total_duplicate += 1
-            if qty >= 3:
-                total_triple += 1
-
-        return {
-            "all": len(self.monsters),
-            "needed": total_needed,
-            "collected": total_collected,
-            "duplicate": total_duplicate,
-            "triple": total_triple,
-        }
-
     @rx.var
     def wants_list(self) -> list[str]:
         validated = set(self.validated_steps)
         wants: list[str] = []
         for monster in self.monsters:
             qty = int(self.counts.get(monster["name"], 0))
-            if qty <= 0 and int(monster["step"]) not in validated:
+            if qty <= 0 and monster["step"] not in validated:
                 wants.append(monster["name"])
         return wants
 
@@ -1397,7 +1699,7 @@ class TrackerState(rx.State):
         offers: list[str] = []
         for monster in self.monsters:
             qty = int(self.counts.get(monster["name"], 0))
-            if qty > 1 or (qty >= 1 and int(monster["step"]) in validated):
+            if qty > 1 or (qty >= 1 and monster["step"] in validated):
                 offers.append(f"{monster['name']} ({qty}x)")
         return offers
 
@@ -1,8 +1,10 @@
+import ctypes
 import json
 import os
 import sys
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Tuple
 
@@ -33,9 +35,33 @@ except ImportError:
     cv2 = None  # type: ignore
     np = None   # type: ignore
 
+# numba (optional): native greedy NMS without materializing the pairwise IoU matrix
+try:
+    from numba import njit
+except ImportError:
+    njit = None  # type: ignore
+
+# mss (optional): faster screen capture than pyautogui/PIL, falls back to pyautogui if missing
+try:
+    import mss
+except ImportError:
+    mss = None  # type: ignore
+
+# orjson (optional): faster JSON parse/dump for the names file and results.json
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
 # --- Config ----
 TYPE_INTERVAL = 0.02            # typing speed (fallback)
 POST_TYPE_DELAY = 1           # wait after typing before scanning (seconds)
+ADAPTIVE_SETTLE = True          # stop waiting early once the screen stops changing (POST_TYPE_DELAY = max wait)
+SETTLE_MIN_DELAY = 0.25         # always wait at least this long after paste (seconds)
+SETTLE_POLL = 0.03              # screen poll interval while waiting (seconds)
+SETTLE_STABLE_FRAMES = 3        # consecutive identical frames required to call the UI settled
+SETTLE_ROI = (-150, 40, 300, 240)  # results-grid patch watched while settling: (dx, dy, w, h) from the search bar click
+PAUSE_POLL = 0.02               # poll interval while paused with F10 (seconds)
 SAVE_EVERY = 12                 # save intermediate progress every N names
 IMAGE_FILE = "archimonsterImg.png"  # template to find on the screen
 JSON_INPUT = "archimonstres_par_zone.json"
@@ -54,6 +80,73 @@ SCALE_FACTORS = [0.75, 0.85, 1.0, 1.15, 1.3]
 MULTISCALE_THRESHOLD = 0.88
 # Skip too-small templates to avoid noisy matches
 MIN_TEMPLATE_WH = 12
+# Coarse-to-fine: match on a pyrDown (half-res) image first, then re-score peaks at full res
+USE_PYRAMID = True
+PYRAMID_DOWN = 2          # pyrDown halves each side
+PYRAMID_MARGIN = 0.1      # coarse pass threshold = MULTISCALE_THRESHOLD - margin (keeps recall)
+PYRAMID_RADIUS = 2        # full-res re-score neighbourhood (+/- px) around each coarse peak
+
+# --- Windows SendInput (select-all + paste as one batched call) ---
+INPUT_KEYBOARD = 1
+KEYEVENTF_KEYUP = 0x0002
+VK_LCONTROL = 0xA2
+VK_A = 0x41
+VK_V = 0x56
+
+
+class _KEYBDINPUT(ctypes.Structure):
+    _fields_ = [
+        ("wVk", ctypes.c_ushort),
+        ("wScan", ctypes.c_ushort),
+        ("dwFlags", ctypes.c_ulong),
+        ("time", ctypes.c_ulong),
+        ("dwExtraInfo", ctypes.c_size_t),
+    ]
+
+
+class _MOUSEINPUT(ctypes.Structure):
+    # Only here so the INPUT union has the size Windows expects
+    _fields_ = [
+        ("dx", ctypes.c_long),
+        ("dy", ctypes.c_long),
+        ("mouseData", ctypes.c_ulong),
+        ("dwFlags", ctypes.c_ulong),
+        ("time", ctypes.c_ulong),
+        ("dwExtraInfo", ctypes.c_size_t),
+    ]
+
+
+class _INPUTUNION(ctypes.Union):
+    _fields_ = [("ki", _KEYBDINPUT), ("mi", _MOUSEINPUT)]
+
+
+class _INPUT(ctypes.Structure):
+    _fields_ = [("type", ctypes.c_ulong), ("u", _INPUTUNION)]
+
+
+def _build_key_inputs(events: List[Tuple[int, bool]]):
+    inputs = (_INPUT * len(events))()
+    for i, (vk, key_up) in enumerate(events):
+        inputs[i].type = INPUT_KEYBOARD
+        inputs[i].u.ki = _KEYBDINPUT(wVk=vk, dwFlags=KEYEVENTF_KEYUP if key_up else 0)
+    return inputs
+
+
+_user32 = ctypes.windll.user32 if sys.platform == "win32" else None  # type: ignore[attr-defined]
+# Ctrl+A then Ctrl+V, prebuilt once
+_SELECT_ALL_PASTE = _build_key_inputs([
+    (VK_LCONTROL, False), (VK_A, False), (VK_A, True), (VK_LCONTROL, True),
+    (VK_LCONTROL, False), (VK_V, False), (VK_V, True), (VK_LCONTROL, True),
+])
+
+
+def _send_select_all_paste() -> bool:
+    # One SendInput call for the whole sequence; Windows keeps the events ordered
+    if _user32 is None:
+        return False
+    count = len(_SELECT_ALL_PASTE)
+    return _user32.SendInput(count, _SELECT_ALL_PASTE, ctypes.sizeof(_INPUT)) == count
+
 
 # --- Globals ---
 search_bar_pos: Tuple[int, int] | None = None
@@ -63,12 +156,19 @@ scan_paused = False                    # toggled by F10 to pause/resume scan loo
 kb_listener: keyboard.Listener | None = None
 screen_w, screen_h = pyautogui.size()
 leftRegion = (0, 0, screen_w // 2, screen_h)
+_MSS_MONITOR = {"left": leftRegion[0], "top": leftRegion[1], "width": leftRegion[2], "height": leftRegion[3]}
+_MSS_LOCAL = threading.local()  # mss handles must stay on the thread that created them
 
 # Cache for template image (for multi-scale mode)
 _TPL_CACHE = {
     "path": None,        # type: ignore
     "img_gray": None,   # type: ignore
+    "scaled": [],       # per-scale {"tpl", "tpl_small", "w", "h"}, built once at load
 }
+# Reused grayscale screenshot buffer (avoids a fresh allocation per scan)
+_IMG_BUF = None
+# Scales are matched concurrently (matchTemplate releases the GIL)
+_SCALE_POOL = ThreadPoolExecutor(max_workers=len(SCALE_FACTORS), thread_name_prefix="scale-match")
 
 
 def log(msg: str) -> None:
@@ -77,19 +177,14 @@ def log(msg: str) -> None:
 
 def gather_names(data: Dict) -> List[str]:
     """Extract unique archimonster names from the zones JSON (key 'nom')."""
-    seen = set()
-    names: List[str] = []
-    zones = data.get("zones", [])
-    for zone in zones:
-        for sz in zone.get("souszones", []):
-            for archi in sz.get("archimonstres", []):
-                name = archi.get("nom")
-                if not name or not isinstance(name, str):
-                    continue
-                if name not in seen:
-                    seen.add(name)
-                    names.append(name)
-    return names
+    # dict.fromkeys keeps first-seen order while deduplicating in one pass
+    return list(dict.fromkeys(
+        name
+        for zone in data.get("zones", ())
+        for sz in zone.get("souszones", ())
+        for archi in sz.get("archimonstres", ())
+        if isinstance(name := archi.get("nom"), str) and name
+    ))
 
 
 def on_press(key):
@@ -148,11 +243,12 @@ def wait_for_start_hotkey() -> Tuple[int, int]:
 def click_and_type(text: str, pos: Tuple[int, int]) -> None:
     # Bring focus to search bar
     pyautogui.click(pos[0], pos[1])
-    time.sleep(0.05)
     # Copy to clipboard and paste (replace existing text)
     try:
         pyperclip.copy(text)
-        time.sleep(0.02)
+        if _send_select_all_paste():
+            return
+        time.sleep(0.05)
         pyautogui.hotkey('ctrl', 'a')
         time.sleep(0.03)
         pyautogui.hotkey('ctrl', 'v')
@@ -168,28 +264,89 @@ def click_and_type(text: str, pos: Tuple[int, int]) -> None:
 
 # Simple IoU-based de-duplication for pyautogui/pyscreeze Box results
 def _rect_iou(a, b):
-    ax1, ay1, aw, ah = a.left, a.top, a.width, a.height
-    bx1, by1, bw, bh = b.left, b.top, b.width, b.height
-    ax2, ay2 = ax1 + aw, ay1 + ah
-    bx2, by2 = bx1 + bw, by1 + bh
-    inter_w = max(0, min(ax2, bx2) - max(ax1, bx1))
-    inter_h = max(0, min(ay2, by2) - max(ay1, by1))
+    # a, b are (x1, y1, x2, y2, area) tuples
+    inter_w = min(a[2], b[2]) - max(a[0], b[0])
+    if inter_w <= 0:
+        return 0.0
+    inter_h = min(a[3], b[3]) - max(a[1], b[1])
+    if inter_h <= 0:
+        return 0.0
     inter = inter_w * inter_h
-    union = aw * ah + bw * bh - inter
+    union = a[4] + b[4] - inter
     return inter / union if union else 0.0
 
 def _dedup_overlaps(boxes, iou_threshold: float = IOU_THRESHOLD):
     if not boxes:
         return boxes
-    # sort for stable selection
+    # sort for stable selection; read box attributes once into (x1, y1, x2, y2, area)
     boxes = sorted(boxes, key=lambda b: (b.left, b.top))
+    rects = [(b.left, b.top, b.left + b.width, b.top + b.height, b.width * b.height) for b in boxes]
     kept = []
-    for b in boxes:
-        if all(_rect_iou(b, k) < iou_threshold for k in kept):
+    kept_rects = []
+    for b, r in zip(boxes, rects):
+        if all(_rect_iou(r, k) < iou_threshold for k in kept_rects):
             kept.append(b)
+            kept_rects.append(r)
     return kept
 
 
+def _nms_kernel(x1, y1, x2, y2, order, iou_threshold):
+    # Greedy NMS in plain loops (compiled by numba when available); O(N) memory
+    n = order.shape[0]
+    suppressed = np.zeros(n, dtype=np.bool_)
+    keep = np.zeros(n, dtype=np.bool_)
+    for a in range(n):
+        i = order[a]
+        if suppressed[i]:
+            continue
+        keep[i] = True
+        area_i = (x2[i] - x1[i]) * (y2[i] - y1[i])
+        for b in range(a + 1, n):
+            j = order[b]
+            if suppressed[j]:
+                continue
+            inter_w = min(x2[i], x2[j]) - max(x1[i], x1[j])
+            if inter_w <= 0:
+                continue
+            inter_h = min(y2[i], y2[j]) - max(y1[i], y1[j])
+            if inter_h <= 0:
+                continue
+            inter = inter_w * inter_h
+            area_j = (x2[j] - x1[j]) * (y2[j] - y1[j])
+            if inter / (area_i + area_j - inter) >= iou_threshold:
+                suppressed[j] = True
+    return keep
+
+
+if njit is not None:
+    _nms_kernel = njit(cache=True, fastmath=True)(_nms_kernel)
+
+
+def _nms_rows(rows: List[Tuple[int, int, int, int]], scores: List[float], iou_threshold: float = IOU_THRESHOLD):
+    # Vectorized greedy NMS over (x, y, w, h) rows, best score first; returns kept rows sorted by (x, y)
+    arr = np.asarray(rows, dtype=np.int32)
+    x1, y1 = arr[:, 0], arr[:, 1]
+    x2, y2 = x1 + arr[:, 2], y1 + arr[:, 3]
+    order = np.argsort(-np.asarray(scores, dtype=np.float32), kind="stable")
+    if njit is not None:
+        kept = arr[_nms_kernel(x1, y1, x2, y2, order, iou_threshold)]
+        return kept[np.lexsort((kept[:, 1], kept[:, 0]))]
+    areas = (arr[:, 2] * arr[:, 3]).astype(np.float64)
+    inter_w = np.clip(np.minimum(x2[:, None], x2[None, :]) - np.maximum(x1[:, None], x1[None, :]), 0, None)
+    inter_h = np.clip(np.minimum(y2[:, None], y2[None, :]) - np.maximum(y1[:, None], y1[None, :]), 0, None)
+    inter = inter_w * inter_h
+    iou = inter / (areas[:, None] + areas[None, :] - inter)
+    suppressed = np.zeros(len(arr), dtype=bool)
+    keep: List[int] = []
+    for i in order:
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        suppressed |= iou[i] >= iou_threshold
+    kept = arr[keep]
+    return kept[np.lexsort((kept[:, 1], kept[:, 0]))]
+
+
 class _Box:
     # Minimal Box-like class to interop with _dedup_overlaps
     def __init__(self, left: int, top: int, width: int, height: int):
@@ -208,8 +365,26 @@ def _ensure_tpl_loaded(template_path: str):
     tpl = cv2.imread(template_path, cv2.IMREAD_GRAYSCALE if GRAYSCALE else cv2.IMREAD_COLOR)
     if tpl is None:
         raise FileNotFoundError(f"Failed to load template via OpenCV: {template_path}")
+    scaled: List[Dict] = []
+    h, w = tpl.shape[:2]
+    for s in SCALE_FACTORS:
+        w_s = max(1, int(w * s))
+        h_s = max(1, int(h * s))
+        if w_s < MIN_TEMPLATE_WH or h_s < MIN_TEMPLATE_WH:
+            continue
+        tpl_s = cv2.resize(tpl, (w_s, h_s), interpolation=cv2.INTER_AREA if s < 1.0 else cv2.INTER_CUBIC)
+        tpl_small = cv2.pyrDown(tpl_s)
+        if min(tpl_small.shape[:2]) < MIN_TEMPLATE_WH:
+            tpl_small = None  # too small to match reliably at half-res; use full-res only
+        scaled.append({
+            "tpl": tpl_s,
+            "tpl_small": tpl_small,
+            "w": w_s,
+            "h": h_s,
+        })
     _TPL_CACHE["path"] = template_path
     _TPL_CACHE["img_gray"] = tpl
+    _TPL_CACHE["scaled"] = scaled
 
 
 def highlight_first_match(box: _Box | None) -> None:
@@ -234,56 +409,151 @@ def highlight_first_match(box: _Box | None) -> None:
     log(f"Double-clicked first match at ({center_x}, {center_y})")
 
 
+def _grab_region_image():
+    # Capture leftRegion and convert it into the reused _IMG_BUF (grayscale or BGR)
+    global _IMG_BUF
+    if mss is not None:
+        sct = getattr(_MSS_LOCAL, "sct", None)
+        if sct is None:
+            sct = _MSS_LOCAL.sct = mss.mss()
+        raw = sct.grab(_MSS_MONITOR)
+        frame = np.frombuffer(raw.raw, dtype=np.uint8).reshape(raw.height, raw.width, 4)
+        code = cv2.COLOR_BGRA2GRAY if GRAYSCALE else cv2.COLOR_BGRA2BGR
+    else:
+        frame = np.asarray(pyautogui.screenshot(region=leftRegion))
+        code = cv2.COLOR_RGB2GRAY if GRAYSCALE else cv2.COLOR_RGB2BGR
+    if _IMG_BUF is None or _IMG_BUF.shape[:2] != frame.shape[:2]:
+        _IMG_BUF = cv2.cvtColor(frame, code)
+    else:
+        cv2.cvtColor(frame, code, dst=_IMG_BUF)
+    return _IMG_BUF
+
+
+def _peaks(res, threshold: float):
+    # cv2.minMaxLoc is a cheap reduction; skip np.where's allocations when nothing passes
+    if cv2.minMaxLoc(res)[1] < threshold:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    return np.where(res >= threshold)
+
+
+def _match_scale_pyramid(img, img_small, entry: Dict):
+    # Coarse pass on the half-res image, then full-res TM_CCOEFF_NORMED on a tiny ROI per peak
+    coarse = cv2.matchTemplate(img_small, entry["tpl_small"], cv2.TM_CCOEFF_NORMED)
+    cys, cxs = _peaks(coarse, MULTISCALE_THRESHOLD - PYRAMID_MARGIN)
+    H_img, W_img = img.shape[:2]
+    w_s, h_s = entry["w"], entry["h"]
+    found: Dict[Tuple[int, int], float] = {}
+    for cx, cy in zip(cxs.tolist(), cys.tolist()):
+        x0 = max(0, cx * PYRAMID_DOWN - PYRAMID_RADIUS)
+        y0 = max(0, cy * PYRAMID_DOWN - PYRAMID_RADIUS)
+        x1 = min(W_img, cx * PYRAMID_DOWN + PYRAMID_RADIUS + w_s)
+        y1 = min(H_img, cy * PYRAMID_DOWN + PYRAMID_RADIUS + h_s)
+        if x1 - x0 < w_s or y1 - y0 < h_s:
+            continue
+        res = cv2.matchTemplate(img[y0:y1, x0:x1], entry["tpl"], cv2.TM_CCOEFF_NORMED)
+        ys, xs = _peaks(res, MULTISCALE_THRESHOLD)
+        for x, y, score in zip(xs.tolist(), ys.tolist(), res[ys, xs].tolist()):
+            found[(x0 + x, y0 + y)] = score
+    xs = np.fromiter((x for x, _ in found), dtype=np.int64, count=len(found))
+    ys = np.fromiter((y for _, y in found), dtype=np.int64, count=len(found))
+    return xs, ys, np.fromiter(found.values(), dtype=np.float32, count=len(found)), w_s, h_s
+
+
+def _match_scale(img, img_small, entry: Dict):
+    # Match one cached template scale; returns above-threshold coordinates and their scores
+    if img_small is not None and entry["tpl_small"] is not None:
+        return _match_scale_pyramid(img, img_small, entry)
+    res = cv2.matchTemplate(img, entry["tpl"], cv2.TM_CCOEFF_NORMED)
+    ys, xs = _peaks(res, MULTISCALE_THRESHOLD)
+    return xs, ys, res[ys, xs], entry["w"], entry["h"]
+
+
+def _settle_region(pos: Tuple[int, int]) -> Tuple[int, int, int, int]:
+    # SETTLE_ROI anchored below the search bar (so the typed text itself is excluded), clipped to the screen
+    dx, dy, w, h = SETTLE_ROI
+    left = min(max(0, pos[0] + dx), screen_w - 1)
+    top = min(max(0, pos[1] + dy), screen_h - 1)
+    return left, top, max(1, min(w, screen_w - left)), max(1, min(h, screen_h - top))
+
+
+def grab_settle_frame(pos: Tuple[int, int]):
+    # Small capture of the results grid only; None when settling is disabled or unavailable
+    if not ADAPTIVE_SETTLE or np is None:
+        return None
+    left, top, width, height = _settle_region(pos)
+    if mss is not None:
+        sct = getattr(_MSS_LOCAL, "sct", None)
+        if sct is None:
+            sct = _MSS_LOCAL.sct = mss.mss()
+        raw = sct.grab({"left": left, "top": top, "width": width, "height": height})
+        return np.frombuffer(raw.raw, dtype=np.uint8).copy()
+    return np.asarray(pyautogui.screenshot(region=(left, top, width, height)))
+
+
+def wait_until_settled(pos: Tuple[int, int], before=None) -> None:
+    # Wait for the results grid to repaint and then stop changing, instead of always sleeping
+    # POST_TYPE_DELAY. `before` is the grid captured before the paste: until a frame differs from
+    # it the old results are still on screen, so they never count as settled.
+    if before is None:
+        time.sleep(POST_TYPE_DELAY)
+        return
+    start = time.perf_counter()
+    time.sleep(SETTLE_MIN_DELAY)
+    repainted = False
+    prev = None
+    stable = 0
+    while time.perf_counter() - start < POST_TYPE_DELAY:
+        cur = grab_settle_frame(pos)
+        if not repainted:
+            repainted = not np.array_equal(cur, before)
+        elif np.array_equal(cur, prev):
+            stable += 1
+            if stable >= SETTLE_STABLE_FRAMES:
+                return
+        else:
+            stable = 0
+        prev = cur
+        time.sleep(SETTLE_POLL)
+
+
 def _count_icons_on_screen_multiscale(template_path: str) -> int:
     if cv2 is None or np is None:
         # Fallback to pyautogui if OpenCV not available
         return _count_icons_on_screen_pyauto(template_path)
 
     _ensure_tpl_loaded(template_path)
-    tpl = _TPL_CACHE["img_gray"]
-    if tpl is None:
+    if _TPL_CACHE["img_gray"] is None:
         return 0
 
     # Screenshot the region and convert to OpenCV format
-    shot = pyautogui.screenshot(region=leftRegion)
-    shot_np = np.array(shot)
-    if GRAYSCALE:
-        # shot_np is RGB; convert to grayscale
-        img = cv2.cvtColor(shot_np, cv2.COLOR_RGB2GRAY)
-    else:
-        img = cv2.cvtColor(shot_np, cv2.COLOR_RGB2BGR)
+    img = _grab_region_image()
 
     H_img, W_img = img.shape[:2]
+    img_small = cv2.pyrDown(img) if USE_PYRAMID else None
 
-    boxes: List[_Box] = []
-    for s in SCALE_FACTORS:
-        # Resize template for this scale
-        h, w = tpl.shape[:2]
-        w_s = max(1, int(w * s))
-        h_s = max(1, int(h * s))
-        if w_s < MIN_TEMPLATE_WH or h_s < MIN_TEMPLATE_WH:
-            continue
-        tpl_s = cv2.resize(tpl, (w_s, h_s), interpolation=cv2.INTER_AREA if s < 1.0 else cv2.INTER_CUBIC)
+    # If template becomes larger than image, skip
+    entries = [e for e in _TPL_CACHE["scaled"] if e["w"] <= W_img and e["h"] <= H_img]
+    futures = [_SCALE_POOL.submit(_match_scale, img, img_small, entry) for entry in entries]
 
-        # If template becomes larger than image, skip
-        if w_s > W_img or h_s > H_img:
-            continue
+    rows: List[Tuple[int, int, int, int]] = []
+    scores: List[float] = []
+    for fut in futures:
+        xs, ys, found, w_s, h_s = fut.result()
+        # x,y are in the screenshot coordinate system; map to screen region coords
+        rows.extend((leftRegion[0] + int(x), leftRegion[1] + int(y), w_s, h_s) for x, y in zip(xs, ys))
+        scores.extend(found.tolist())
 
-        # Match
-        res = cv2.matchTemplate(img, tpl_s, cv2.TM_CCOEFF_NORMED)
-        loc = np.where(res >= MULTISCALE_THRESHOLD)
-        for (y, x) in zip(*loc):
-            # x,y are in the screenshot coordinate system; map to screen region coords
-            boxes.append(_Box(leftRegion[0] + x, leftRegion[1] + y, w_s, h_s))
+    if not rows:
+        return 0
 
     # Deduplicate overlapping boxes across scales
-    boxes = _dedup_overlaps(boxes, IOU_THRESHOLD)
-    
-    # Highlight first match if Ctrl+Click mode is enabled
-    if boxes:
-        highlight_first_match(boxes[0])
-    
-    return len(boxes)
+    kept = _nms_rows(rows, scores, IOU_THRESHOLD)
+
+    # Highlight first match if Ctrl+Click mode is enabled (only pack mode needs a Box)
+    if pack_archi_enabled and len(kept):
+        highlight_first_match(_Box(*kept[0]))
+
+    return len(kept)
 
 
 def _count_icons_on_screen_pyauto(template_path: str) -> int:
@@ -349,8 +619,7 @@ def _resolve_profile(profile: str | None = None) -> str:
     cfg_path = os.path.join(here, "metamob.config.json")
     if os.path.exists(cfg_path):
         try:
-            with open(cfg_path, "r", encoding="utf-8") as f:
-                cfg = json.load(f) or {}
+            cfg = _read_json_file(cfg_path) or {}
             cfg_profile = _safe_profile(cfg.get("profile") or cfg.get("activeProfile") or cfg.get("defaultProfile"))
             if cfg_profile:
                 return cfg_profile
@@ -360,8 +629,7 @@ def _resolve_profile(profile: str | None = None) -> str:
     results_path = os.path.join(here, RESULTS_FILE)
     if os.path.exists(results_path):
         try:
-            with open(results_path, "r", encoding="utf-8") as f:
-                payload = json.load(f) or {}
+            payload = _read_json_file(results_path) or {}
             active = _safe_profile(payload.get("activeProfile"))
             if active:
                 return active
@@ -371,50 +639,75 @@ def _resolve_profile(profile: str | None = None) -> str:
     return "default"
 
 
+def _read_json_file(path: str):
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+
+def _dump_json(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
 def _load_all_results(path: str) -> Dict:
     if os.path.exists(path):
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                data = json.load(f) or {}
+            data = _read_json_file(path) or {}
         except Exception:
             data = {}
     else:
         data = {}
     if 'profiles' in data and isinstance(data.get('profiles'), dict):
         return data
-    # Old flat format: wrap into default and mirror
+    # Old flat format: wrap into default
     if 'counts' in data:
-        wrapped = {
+        return {
             'profiles': {'default': data},
             'activeProfile': 'default'
         }
-        wrapped.update(data)
-        return wrapped
     return {'profiles': {}, 'activeProfile': 'default'}
 
 
-def save_results_profile(path: str, profile: str, payload: Dict) -> None:
+def save_results_profile(path: str, profile: str, payload: Dict, durable: bool = False) -> None:
+    # Re-read on every save so edits made by the tracker to other profiles are kept
     data = _load_all_results(path)
     profiles = data.get('profiles') or {}
     profiles[profile] = payload
     data['profiles'] = profiles
     data['activeProfile'] = profile
-    # mirror to top-level for back-compat
+    # payloads live under 'profiles' only; drop the old top-level mirror
     for k in list(data.keys()):
         if k not in {'profiles', 'activeProfile'}:
             del data[k]
-    data.update(payload)
     tmp = path + ".tmp"
-    with open(tmp, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    with open(tmp, 'wb') as f:
+        f.write(_dump_json(data))
+        if durable:
+            f.flush()
+            os.fsync(f.fileno())
     os.replace(tmp, path)
 
 
 def make_payload(names: List[str], counts: Dict[str, int], scanned: int) -> Dict:
-    needed = [n for n, k in counts.items() if k <= 0]
-    duplicates = [{"name": n, "count": k, "extra": max(0, k - 1)} for n, k in counts.items() if k > 1]
-    total_found_unique = sum(1 for k in counts.values() if k >= 1)
-    total_found_items = sum(counts.values())
+    # Single pass over counts for every derived field
+    needed: List[str] = []
+    duplicates: List[Dict] = []
+    total_found_unique = 0
+    total_found_items = 0
+    total_duplicates = 0
+    for n, k in counts.items():
+        total_found_items += k
+        if k <= 0:
+            needed.append(n)
+            continue
+        total_found_unique += 1
+        if k > 1:
+            duplicates.append({"name": n, "count": k, "extra": k - 1})
+            total_duplicates += k - 1
     return {
         "timestamp": datetime.utcnow().isoformat() + "Z",
         "scanned": scanned,
@@ -422,7 +715,7 @@ def make_payload(names: List[str], counts: Dict[str, int], scanned: int) -> Dict
         "counts": counts,
         "needed": needed,
         "duplicates": duplicates,
-        "totalDuplicates": sum(d["extra"] for d in duplicates),
+        "totalDuplicates": total_duplicates,
         "totalFound": total_found_unique,      # unique names with >=1 found
         "totalFoundItems": total_found_items,  # sum of all counts
         "note": "F8=start (capture search bar). F10=pause/resume. Move mouse to top-left to abort.",
@@ -443,8 +736,7 @@ def main(profile: str | None = None):
     log(f"Using profile: {profile}")
 
     # Load names
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = _read_json_file(json_path)
     names = gather_names(data)
     total_expected = 286  # per user statement
 
@@ -456,14 +748,16 @@ def main(profile: str | None = None):
     # Iterate and scan
     counts: Dict[str, int] = {}
     scanned = 0
+    out_path = os.path.join(os.path.dirname(json_path), RESULTS_FILE)
 
     try:
         for name in names:
             while scan_paused:
-                time.sleep(0.15)
+                time.sleep(PAUSE_POLL)
+            before = grab_settle_frame(pos)
             click_and_type(name, pos)
 
-            time.sleep(POST_TYPE_DELAY)
+            wait_until_settled(pos, before)
             try:
                 c = count_icons_on_screen(image_path)
             except Exception as e:
@@ -474,13 +768,12 @@ def main(profile: str | None = None):
 
             if scanned % SAVE_EVERY == 0:
                 payload = make_payload(names, counts, scanned)
-                save_results_profile(os.path.join(os.path.dirname(json_path), RESULTS_FILE), profile, payload)
+                save_results_profile(out_path, profile, payload)
                 log(f"Progress saved after {scanned} scans.")
 
         # Finalize results
         result = make_payload(names, counts, scanned)
-        out_path = os.path.join(os.path.dirname(json_path), RESULTS_FILE)
-        save_results_profile(out_path, profile, result)
+        save_results_profile(out_path, profile, result, durable=True)
         log(f"Done. Scanned {scanned}/{len(names)} names. Results saved to: {out_path}")
     finally:
         stop_hotkey_listener()